@@ -11,11 +11,15 @@
 # Python imports
 #/////////////////////////////////////////////////////////////////////////////////////////
 import httplib
+import io
 import re
 import requests
 import time
 import urllib2
-import xml.etree.ElementTree
+try:
+	import xml.etree.cElementTree as ElementTree
+except ImportError:
+	import xml.etree.ElementTree as ElementTree
 import indigo
 import RPFramework
 
@@ -37,6 +41,7 @@ MEDIACONTAINERTYPE_SESSIONLIST = 3
 #/////////////////////////////////////////////////////////////////////////////////////////
 #/////////////////////////////////////////////////////////////////////////////////////////
 class PlexMediaContainer(object):
+	__slots__ = ('containerAttributes', 'directories', 'clients', 'videoSessions', 'containerType')
 	
 	#/////////////////////////////////////////////////////////////////////////////////////
 	# Class construction and destruction methods
@@ -62,34 +67,47 @@ class PlexMediaContainer(object):
 		else:
 			self.containerType = MEDIACONTAINERTYPE_UNKNOWN
 	
-		# parse the XML provided...
-		mediaContainerNode = xml.etree.ElementTree.fromstring(RPFramework.RPFrameworkUtils.to_str(mediaContainerXml))
-		
-		# the root container node will have a bunch of attributes which should be loaded into
-		# our attributes container
-		for key,value in mediaContainerNode.items():
-			self.containerAttributes[key] = value
-		
-		# retrieve the list of directories that may be content of the media container
-		# node
-		for directoryNode in mediaContainerNode.findall(u'Directory'):
-			self.directories.append(PlexMediaContainerDirectory(directoryNode))
+		# parse the XML provided as a stream (using the C-based parser whenever it is available) so
+		# that each child of the media container may be released as soon as it has been processed;
+		# the children are dispatched based upon their tag:
+		#	Directory - anything that may be drilled into further
+		#	Server - connected clients (not necessarily streaming now)
+		#	Video/Track - session status, with embedded player and media information nodes
+		# audio sessions are kept after the video sessions so that slot numbering is unchanged
+		mediaContainerNode = None
+		nodeDepth = 0
+		audioSessions = list()
+		for parseEvent, xmlNode in ElementTree.iterparse(io.BytesIO(RPFramework.RPFrameworkUtils.to_str(mediaContainerXml)), events=('start', 'end')):
+			if parseEvent == 'start':
+				nodeDepth += 1
+				if mediaContainerNode is None:
+					# the root container node will have a bunch of attributes which should be loaded into
+					# our attributes container
+					mediaContainerNode = xmlNode
+					self.containerAttributes.update(mediaContainerNode.attrib)
+				continue
 			
-		# retrieve the list of clients that may be content of the media container
-		# node (these are connected clients, not necessarily streaming now)
-		if self.containerType == MEDIACONTAINERTYPE_CLIENTLIST:
-			for clientNode in mediaContainerNode.findall(u'Server'):
-				self.clients.append(PlexMediaClient(clientNode))
-			
-		# the session status requires special handling - it will have a Video node along with
-		# embedded player and media information nodes
-		if self.containerType == MEDIACONTAINERTYPE_SESSIONLIST:
-			for video in mediaContainerNode.findall(u'Video'):
-				self.videoSessions.append(PlexMediaContainerVideoSession(video))
-			for audio in mediaContainerNode.findall(u'Track'):
-				self.videoSessions.append(PlexMediaContainerVideoSession(audio))
+			nodeDepth -= 1
+			if nodeDepth != 1:
+				continue
 				
-		mediaContainerNode.clear()
+			childTag = xmlNode.tag
+			if childTag == u'Directory':
+				self.directories.append(PlexMediaContainerDirectory(xmlNode))
+			elif childTag == u'Server':
+				if self.containerType == MEDIACONTAINERTYPE_CLIENTLIST:
+					self.clients.append(PlexMediaClient(xmlNode))
+			elif childTag == u'Video':
+				if self.containerType == MEDIACONTAINERTYPE_SESSIONLIST:
+					self.videoSessions.append(PlexMediaContainerVideoSession(xmlNode))
+			elif childTag == u'Track':
+				if self.containerType == MEDIACONTAINERTYPE_SESSIONLIST:
+					audioSessions.append(PlexMediaContainerVideoSession(xmlNode))
+			
+			# the child has been fully processed, so release it; clearing the container node is safe
+			# since its attributes were copied when the parse started
+			mediaContainerNode.clear()
+		self.videoSessions.extend(audioSessions)
 		
 		
 #/////////////////////////////////////////////////////////////////////////////////////////
@@ -100,6 +118,7 @@ class PlexMediaContainer(object):
 #/////////////////////////////////////////////////////////////////////////////////////////
 #/////////////////////////////////////////////////////////////////////////////////////////
 class PlexMediaContainerDirectory(object):
+	__slots__ = ('dictionaryAttributes', 'genreList')
 		
 	#/////////////////////////////////////////////////////////////////////////////////////
 	# Class construction and destruction methods
@@ -130,6 +149,7 @@ class PlexMediaContainerDirectory(object):
 #/////////////////////////////////////////////////////////////////////////////////////////
 #/////////////////////////////////////////////////////////////////////////////////////////
 class PlexMediaClient(object):
+	__slots__ = ('clientAttributes',)
 		
 	#/////////////////////////////////////////////////////////////////////////////////////
 	# Class construction and destruction methods
@@ -151,16 +171,16 @@ class PlexMediaClient(object):
 	# Public Utilities
 	#/////////////////////////////////////////////////////////////////////////////////////
 	def getClientId(self):
-		return RPFramework.RPFrameworkUtils.to_unicode(self.clientAttributes["machineIdentifier"] if "machineIdentifier" in self.clientAttributes else "")
+		return self.clientAttributes.get(u'machineIdentifier', u'')
 	
 	def getClientName(self):
-		return RPFramework.RPFrameworkUtils.to_unicode(self.clientAttributes["product"] if "product" in self.clientAttributes else "")
+		return self.clientAttributes.get(u'product', u'')
 		
 	def getClientAddress(self):
-		return RPFramework.RPFrameworkUtils.to_unicode(self.clientAttributes["address"] if "address" in self.clientAttributes else "")
+		return self.clientAttributes.get(u'address', u'')
 		
 	def getClientPort(self):
-		return int(RPFramework.RPFrameworkUtils.to_unicode(self.clientAttributes["port"] if "port" in self.clientAttributes else "0"))
+		return int(self.clientAttributes.get(u'port', 0))
 
 
 
@@ -172,6 +192,7 @@ class PlexMediaClient(object):
 #/////////////////////////////////////////////////////////////////////////////////////////
 #/////////////////////////////////////////////////////////////////////////////////////////
 class PlexMediaContainerVideoSession(object):
+	__slots__ = ('videoAttributes', 'userInfo', 'playerInfo', 'mediaInfo', 'genreList', 'contentDuration', 'viewOffset')
 	
 	#/////////////////////////////////////////////////////////////////////////////////////
 	# Class construction and destruction methods
@@ -189,6 +210,11 @@ class PlexMediaContainerVideoSession(object):
 		# the root Video node will have a bunch of attributes which should be loaded into
 		# our attributes container
 		loadXmlElementToDictionary(videoXmlNode, self.videoAttributes)
+		
+		# the length and current position (in milliseconds) are needed as numbers on every
+		# update, so convert them just once here
+		self.contentDuration = loadXmlAttributeAsInt(self.videoAttributes, u'duration')
+		self.viewOffset = loadXmlAttributeAsInt(self.videoAttributes, u'viewOffset')
 			
 		# there may be a "User" node if the session is not an anonymous session; if so then
 		# load all of the user's details into our user dictionary
@@ -222,5 +248,10 @@ class PlexMediaContainerVideoSession(object):
 #/////////////////////////////////////////////////////////////////////////////////////////
 #/////////////////////////////////////////////////////////////////////////////////////////
 def loadXmlElementToDictionary(xmlElement, targetDict):
-	for key,value in xmlElement.items():
-		targetDict[key] = value
+	targetDict.update(xmlElement.attrib)
+	
+def loadXmlAttributeAsInt(attributesDict, attributeName):
+	try:
+		return int(attributesDict.get(attributeName, 0))
+	except ValueError:
+		return 0
@@ -10,13 +10,18 @@
 #/////////////////////////////////////////////////////////////////////////////////////////
 # Python imports
 #/////////////////////////////////////////////////////////////////////////////////////////
+import collections
 import httplib
+import io
+import logging
 import re
 import requests
-import datetime
 import time
 import urllib2
-import xml.etree.ElementTree
+try:
+	import xml.etree.cElementTree as ElementTree
+except ImportError:
+	import xml.etree.ElementTree as ElementTree
 
 import indigo
 import RPFramework
@@ -28,6 +33,68 @@ import plexMediaContainer
 #/////////////////////////////////////////////////////////////////////////////////////////
 PLEX_CMD_DOWNLOAD_CURRENT_ART = u'downloadCurrentlyPlayingArt'
 
+# the numeric level of the Indigo plugin logger's threaddebug messages (below DEBUG)
+THREADDEBUG_LOGGING_LEVEL = 5
+
+# the identifying headers sent to plex.tv that do not depend upon the Indigo server or
+# plugin version
+PLEX_TV_BASE_HEADERS = {u'X-Plex-Platform':u'Indigo', u'X-Plex-Provides':u'controller', u'X-Plex-Product':u'Plex Media Server Manager', u'X-Plex-Device':u'Indigo HA Server', u'X-Plex-Device-Name':u'Indigo Plugin'}
+
+# the states written to a client or client slot device once it is no longer connected to
+# the server; slot devices additionally clear out their clientId
+PLEX_CLIENT_DISCONNECTED_STATES = (
+	{ 'key' : u'clientConnectionStatus', 'value' : u'disconnected' },
+	{ 'key' : u'clientAddress', 'value' : u'' },
+	{ 'key' : u'clientPort', 'value' : 0 },
+	{ 'key' : u'currentUser', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingKey', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingMediaType', 'value' : u'unknown' },
+	{ 'key' : u'currentlyPlayingParentKey', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingTitle', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingSummary', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingArtUrl', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingThumbnailUrl', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingParentTitle', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingParentThumbnailUrl', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingGrandparentKey', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingGrandparentTitle', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingGrandparentArtUrl', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingGrandparentThumbnailUrl', 'value' : u'' },
+	{ 'key' : u'currentlPlayingTitleYear', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingStarRating', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingContentRating', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingContentResolution', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingContentLengthMS', 'value' : 0 },
+	{ 'key' : u'currentlyPlayingContentLengthDisplay', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingContentLengthOffset', 'value' : 0 },
+	{ 'key' : u'currentlyPlayingContentLengthOffsetDisplay', 'value' : u'' },
+	{ 'key' : u'currentlyPlayingContentPercentComplete', 'value' : 0 },
+	{ 'key' : u'currentlyPlayingGenre', 'value' : u'' },
+	{ 'key' : u'playerDeviceTitle', 'value' : u'' }
+)
+PLEX_CLIENT_SLOT_DISCONNECTED_STATES = PLEX_CLIENT_DISCONNECTED_STATES + ({ 'key' : u'clientId', 'value' : u'' },)
+
+# the client states which are copied directly from an attribute of the session's media
+PLEX_SESSION_ATTRIBUTE_STATES = (
+	(u'currentlyPlayingSummary', u'summary'),
+	(u'currentlyPlayingKey', u'key'),
+	(u'currentlyPlayingArtUrl', u'art'),
+	(u'currentlyPlayingThumbnailUrl', u'thumb'),
+	(u'currentlyPlayingParentKey', u'parentKey'),
+	(u'currentlyPlayingParentTitle', u'parentTitle'),
+	(u'currentlyPlayingParentThumbnailUrl', u'parentThumb'),
+	(u'currentlyPlayingGrandparentKey', u'grandparentKey'),
+	(u'currentlyPlayingGrandparentTitle', u'grandparentTitle'),
+	(u'currentlyPlayingGrandparentArtUrl', u'grandparentArt'),
+	(u'currentlyPlayingGrandparentThumbnailUrl', u'grandparentThumb'),
+	(u'currentlPlayingTitleYear', u'year'),
+	(u'currentlyPlayingStarRating', u'rating'),
+	(u'currentlyPlayingContentRating', u'contentRating')
+)
+
+# the "generic slots" which may be selected for a slot client device
+PLEX_CLIENT_SLOT_MENU = tuple((u'Slot %d' % slotNum, u'Slot %d' % slotNum) for slotNum in range(1,11))
+
 
 #/////////////////////////////////////////////////////////////////////////////////////////
 #/////////////////////////////////////////////////////////////////////////////////////////
@@ -52,6 +119,12 @@ class PlexMediaServer(RPFramework.RPFrameworkRESTfulDevice.RPFrameworkRESTfulDev
 		# we will store the list of last clients found so that any dialog box may
 		# instantly retrieve them
 		self.currentClientList = list()
+		self.currentClientIdSet = set()
+		
+		# the client and slot child devices are indexed separately (each keyed by the Plex
+		# client ID) so that updates need only walk the devices of the relevant type
+		self.clientChildDevices = dict()
+		self.slotChildDevices = dict()
 		
 		# we do not need to be quite as interactive as some plugins... so increase the wait
 		# time when the queue is empty
@@ -61,6 +134,14 @@ class PlexMediaServer(RPFramework.RPFrameworkRESTfulDevice.RPFrameworkRESTfulDev
 		# the user desires to require authentication on the server
 		self.plexSecurityToken = u''
 		
+		# the plex.tv requests are made through a session so that its connection may be reused
+		# whenever the token must be re-obtained; the identifying headers never change
+		self.httpSession = requests.Session()
+		self.httpSession.mount(u'https://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+		self.httpSession.mount(u'http://', requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=8))
+		self.httpSession.headers.update(PLEX_TV_BASE_HEADERS)
+		self.httpSession.headers.update({u'X-Plex-Platform-Version':indigo.server.apiVersion, u'X-Plex-Client-Identifier':indigo.server.getDbName(), u'X-Plex-Version':plugin.pluginVersion})
+		
 		# add in updated/new states and properties
 		self.upgradedDeviceProperties.append((u'requestMethod', u'http')) 
 		self.upgradedDeviceProperties.append((u'loginRequired', u'False')) 
@@ -82,6 +163,26 @@ class PlexMediaServer(RPFramework.RPFrameworkRESTfulDevice.RPFrameworkRESTfulDev
 		return (self.indigoDevice.pluginProps.get(u'httpAddress', u''), int(self.indigoDevice.pluginProps.get(u'httpPort', u'80')))
 		
 		
+	#/////////////////////////////////////////////////////////////////////////////////////
+	# Parent/child device overloads
+	#/////////////////////////////////////////////////////////////////////////////////////
+	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+	# Called when a client/slot device starts communication; keep the typed indexes of
+	# the child devices in sync
+	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+	def addChildDevice(self, device):
+		super(PlexMediaServer, self).addChildDevice(device)
+		self.rebuildChildDeviceIndexes()
+		
+	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+	# Called when a client/slot device stops communication; keep the typed indexes of
+	# the child devices in sync
+	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+	def removeChildDevice(self, device):
+		super(PlexMediaServer, self).removeChildDevice(device)
+		self.rebuildChildDeviceIndexes()
+		
+		
 	#/////////////////////////////////////////////////////////////////////////////////////
 	# Action Callbacks and Handlers
 	#/////////////////////////////////////////////////////////////////////////////////////
@@ -93,7 +194,9 @@ class PlexMediaServer(RPFramework.RPFrameworkRESTfulDevice.RPFrameworkRESTfulDev
 		# this should be a valid return to have made it here since this will be called as an
 		# effect and not during initial request processing; the obj should be a string
 		plexContainer = plexMediaContainer.PlexMediaContainer(responseObj, rpCommand.getPayloadAsList()[1])
-		self.hostPlugin.logger.debug(u'MediaContainer Information: ' + RPFramework.RPFrameworkUtils.to_unicode(plexContainer.containerAttributes))
+		debugLoggingEnabled = self.hostPlugin.logger.isEnabledFor(logging.DEBUG)
+		if debugLoggingEnabled:
+			self.hostPlugin.logger.debug(u'MediaContainer Information: ' + RPFramework.RPFrameworkUtils.to_unicode(plexContainer.containerAttributes))
 		
 		# assuming this is the primary command then we need to update the current state information
 		# of this device
@@ -109,216 +212,175 @@ class PlexMediaServer(RPFramework.RPFrameworkRESTfulDevice.RPFrameworkRESTfulDev
 		elif plexContainer.containerType == plexMediaContainer.MEDIACONTAINERTYPE_CLIENTLIST:
 			# here we have a list of the clients connected to the server; this information may be different than the sessions
 			# list so we will only update client devices or slots where the client ID matches already
-			self.hostPlugin.logger.debug(u'Found ' + RPFramework.RPFrameworkUtils.to_unicode(len(plexContainer.clients)) + u' clients')
+			if debugLoggingEnabled:
+				self.hostPlugin.logger.debug(u'Found ' + RPFramework.RPFrameworkUtils.to_unicode(len(plexContainer.clients)) + u' clients')
+			
+			# index the slots by the client currently assigned to them so that each client may
+			# find its slots without walking all of the devices
+			slotDevicesByClientId = dict()
+			for slotDevice in self.slotChildDevices.itervalues():
+				slotDevicesByClientId.setdefault(slotDevice.indigoDevice.states[u'clientId'], []).append(slotDevice)
+				
 			for plexClientNode in plexContainer.clients:
 				clientNodeMachineId = plexClientNode.getClientId()
-				self.hostPlugin.logger.debug(u'Found client with Machine Id: ' + clientNodeMachineId)
+				if debugLoggingEnabled:
+					self.hostPlugin.logger.debug(u'Found client with Machine Id: ' + clientNodeMachineId)
 				if clientNodeMachineId != u'':
 					# determine if we have a match in the devices...
-					if clientNodeMachineId in self.childDevices:
-						clientNodeMatchingDevice = self.childDevices[clientNodeMachineId]
+					if clientNodeMachineId in self.clientChildDevices:
+						clientNodeMatchingDevice = self.clientChildDevices[clientNodeMachineId]
 						if clientNodeMatchingDevice.indigoDevice.states.get(u'clientConnectionStatus', u'') != u'disconnected':
 							clientNodeMatchingStates = [{'key' : u'clientAddress', 'value' : plexClientNode.getClientAddress() }, {'key' : u'clientPort', 'value' : plexClientNode.getClientPort() }]
-							clientNodeMatchingDevice.indigoDevice.updateStatesOnServer(clientNodeMatchingStates)
+							clientNodeMatchingDevice.updateChangedStatesForDevice(clientNodeMatchingStates)
 					
 					# determine if any of our slots in use match this client Idaho
-					for slotDeviceId in self.childDevices:
-						slotDevice = self.childDevices[slotDeviceId]
-						if slotDevice.indigoDevice.deviceTypeId == u'plexMediaClientSlot' and slotDevice.indigoDevice.states[u'clientId'] == clientNodeMachineId:
-							clientNodeMatchingStates = [{'key' : u'clientAddress', 'value' : plexClientNode.getClientAddress() }, {'key' : u'clientPort', 'value' : plexClientNode.getClientPort() }]
-							slotDevice.indigoDevice.updateStatesOnServer(clientNodeMatchingStates)
+					for slotDevice in slotDevicesByClientId.get(clientNodeMachineId, []):
+						clientNodeMatchingStates = [{'key' : u'clientAddress', 'value' : plexClientNode.getClientAddress() }, {'key' : u'clientPort', 'value' : plexClientNode.getClientPort() }]
+						slotDevice.updateChangedStatesForDevice(clientNodeMatchingStates)
 						
 			
 		elif plexContainer.containerType == plexMediaContainer.MEDIACONTAINERTYPE_SESSIONLIST:
-			self.indigoDevice.updateStateOnServer(key=u'activeSessionsCount', value=int(plexContainer.containerAttributes["size"]))
-			self.hostPlugin.logger.debug(u'Found ' + RPFramework.RPFrameworkUtils.to_unicode(len(plexContainer.videoSessions)) + u' active media sessions')
+			if debugLoggingEnabled:
+				self.hostPlugin.logger.debug(u'Found ' + RPFramework.RPFrameworkUtils.to_unicode(len(plexContainer.videoSessions)) + u' active media sessions')
 			
 			# update the status of any child client devices that are currently streaming; we also need to update
 			# the list of available clients for the config dialog boxes
 			newClientList = list()
-			connectedClientHash = dict()
+			connectedClientIds = set()
+			pendingClientStates = dict()
 			slotNum = 0
 			for session in plexContainer.videoSessions:
 				slotNum = slotNum + 1
 				
+				# pull the session's information into locals since each is referenced many times below
+				videoAttributes = session.videoAttributes
+				playerInfo = session.playerInfo
+				mediaInfo = session.mediaInfo
+				userInfo = session.userInfo
+				mediaType = videoAttributes.get(u'type', u'unknown')
+				parentKey = videoAttributes.get(u'parentKey', u'')
+				grandparentKey = videoAttributes.get(u'grandparentKey', u'')
+				grandparentTitle = videoAttributes.get(u'grandparentTitle', u'')
+				
+				# the play position is the same for each client device of the session, so format it once
+				contentDuration = session.contentDuration
+				currentOffset = session.viewOffset
+				contentDurationDisplay = formatMillisecondsForDisplay(contentDuration)
+				currentOffsetDisplay = formatMillisecondsForDisplay(currentOffset)
+				if contentDuration > 0:
+					percentComplete = (currentOffset * 100) // contentDuration
+				else:
+					percentComplete = 0
+				
 				# output debug information
-				self.hostPlugin.logger.debug(u'MediaContainer Media Information: ' + RPFramework.RPFrameworkUtils.to_unicode(session.mediaInfo))
-				self.hostPlugin.logger.debug(u'MediaContainer Player Information: ' + RPFramework.RPFrameworkUtils.to_unicode(session.playerInfo))
-				self.hostPlugin.logger.debug(u'Identified as Slot ' + RPFramework.RPFrameworkUtils.to_unicode(slotNum))
+				if debugLoggingEnabled:
+					self.hostPlugin.logger.debug(u'MediaContainer Media Information: ' + RPFramework.RPFrameworkUtils.to_unicode(mediaInfo))
+					self.hostPlugin.logger.debug(u'MediaContainer Player Information: ' + RPFramework.RPFrameworkUtils.to_unicode(playerInfo))
+					self.hostPlugin.logger.debug(u'Identified as Slot %d' % slotNum)
 			
 				# retrieve the basic identification information about the player which is
 				# connected for this session
-				playerMachineId = session.playerInfo.get(u'machineIdentifier', u'')
-				playerName = session.playerInfo.get(u'title', playerMachineId)
+				playerMachineId = playerInfo.get(u'machineIdentifier', u'')
+				playerName = playerInfo.get(u'title', playerMachineId)
 				
 				# we only have to update state information if this client is a defined Indigo device or a generic
 				# slot has been created
 				clientsToProcess = list()
-				if playerMachineId in self.childDevices:
-					clientsToProcess.append(self.childDevices[playerMachineId])
-				slotClientId = u'Slot ' + RPFramework.RPFrameworkUtils.to_unicode(slotNum)
-				if slotClientId in self.childDevices:
-					clientsToProcess.append(self.childDevices[slotClientId])
+				if playerMachineId in self.clientChildDevices:
+					clientsToProcess.append(self.clientChildDevices[playerMachineId])
+				slotClientId = u'Slot %d' % slotNum
+				if slotClientId in self.slotChildDevices:
+					clientsToProcess.append(self.slotChildDevices[slotClientId])
+				
+				# the states are the same for each client device of the session (other than the client
+				# ID written to a slot) so they are only built once
+				if len(clientsToProcess) > 0:
+					# the title will depend upon the type... show episodes need the show (parent) appended
+					mediaTitle = videoAttributes.get(u'title', u'')
+					if mediaType == u'episode' and grandparentTitle != u'':
+						mediaTitle = grandparentTitle + u' : ' + mediaTitle
+					
+					sessionStatesToUpdate = [{ 'key' : stateKey, 'value' : videoAttributes.get(attributeName, u'') } for stateKey, attributeName in PLEX_SESSION_ATTRIBUTE_STATES]
+					sessionStatesToUpdate.extend([
+						{ 'key' : u'clientConnectionStatus', 'value' : playerInfo.get(u'state', u'connected') },
+						{ 'key' : u'currentUser', 'value' : userInfo.get(u'title', u'') },
+						{ 'key' : u'currentlyPlayingMediaType', 'value' : mediaType },
+						{ 'key' : u'currentlyPlayingTitle', 'value' : mediaTitle },
+						{ 'key' : u'currentlyPlayingContentResolution', 'value' : mediaInfo.get(u'videoResolution', u'') },
+						{ 'key' : u'currentlyPlayingContentLengthMS', 'value' : contentDuration },
+						{ 'key' : u'currentlyPlayingContentLengthDisplay', 'value' : contentDurationDisplay },
+						{ 'key' : u'currentlyPlayingContentLengthOffset', 'value' : currentOffset },
+						{ 'key' : u'currentlyPlayingContentLengthOffsetDisplay', 'value' : currentOffsetDisplay },
+						{ 'key' : u'currentlyPlayingContentPercentComplete', 'value' : percentComplete, 'uiValue' : u'%d%%' % percentComplete },
+						{ 'key' : u'currentlyPlayingGenre', 'value' : ",".join(session.genreList) },
+						{ 'key' : u'playerDeviceTitle', 'value' : playerInfo.get(u'title', u'') }
+					])
 				
 				# process each of the clients found as a match...
-				self.hostPlugin.logger.debug(u'Found ' + RPFramework.RPFrameworkUtils.to_unicode(len(clientsToProcess)) + u' clients to update')
+				if debugLoggingEnabled:
+					self.hostPlugin.logger.debug(u'Found ' + RPFramework.RPFrameworkUtils.to_unicode(len(clientsToProcess)) + u' clients to update')
 				for clientDevice in clientsToProcess:
-					clientStatesToUpdate = []
-					self.hostPlugin.logger.debug(u'Found client device to update for machineID: ' + playerMachineId)
-					clientStatesToUpdate.append({ 'key' : u'clientConnectionStatus', 'value' : session.playerInfo.get(u'state', u'connected') })
-					clientStatesToUpdate.append({ 'key': u'currentUser', 'value' : session.userInfo.get(u'title', u'') })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingMediaType', 'value' : session.videoAttributes.get(u'type', u'unknown')})
-					
+					if debugLoggingEnabled:
+						self.hostPlugin.logger.debug(u'Found client device to update for machineID: ' + playerMachineId)
 					if clientDevice.indigoDevice.deviceTypeId == u'plexMediaClientSlot':
-						clientStatesToUpdate.append({ 'key' : u'clientId', 'value' : playerMachineId })
-					
-					# the title will depend upon the type... show episodes need the show (parent) appended
-					mediaTitle = session.videoAttributes.get(u'title', u'')
-					if session.videoAttributes.get(u'type', u'unknown') == u'episode':
-						grandparentTitle = session.videoAttributes.get(u'grandparentTitle', u'')
-						if grandparentTitle != u'':
-							grandparentTitle = grandparentTitle + u' : '
-						mediaTitle = grandparentTitle + mediaTitle
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingTitle', 'value' : mediaTitle })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingSummary', 'value' : session.videoAttributes.get(u'summary', u'') })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingKey', 'value' : session.videoAttributes.get(u'key', u'') })
-					
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingArtUrl', 'value' : session.videoAttributes.get(u'art', u'') })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingThumbnailUrl', 'value' : session.videoAttributes.get(u'thumb', u'') })
-					
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingParentKey', 'value' : session.videoAttributes.get(u'parentKey', u'') })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingParentTitle', 'value' : session.videoAttributes.get(u'parentTitle', u'') })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingParentThumbnailUrl', 'value' : session.videoAttributes.get(u'parentThumb', u'') })
-					
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGrandparentKey', 'value' : session.videoAttributes.get(u'grandparentKey', u'') })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGrandparentTitle', 'value' : session.videoAttributes.get(u'grandparentTitle', u'') })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGrandparentArtUrl', 'value' : session.videoAttributes.get(u'grandparentArt', u'') })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGrandparentThumbnailUrl', 'value' : session.videoAttributes.get(u'grandparentThumb', u'') })
-					
-					clientStatesToUpdate.append({ 'key' : u'currentlPlayingTitleYear', 'value' : session.videoAttributes.get(u'year', u'') })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingStarRating', 'value' : session.videoAttributes.get(u'rating', u'') })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentRating', 'value' : session.videoAttributes.get(u'contentRating', u'') })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentResolution', 'value' : session.mediaInfo.get(u'videoResolution', u'') })
-					
-					contentDuration = int(session.videoAttributes.get(u'duration', u'0'))
-					currentOffset = int(session.videoAttributes.get(u'viewOffset', u'0'))
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentLengthMS', 'value' : contentDuration })
-					
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentLengthDisplay', 'value' : str(datetime.timedelta(seconds=contentDuration/1000)) })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentLengthOffset', 'value' : currentOffset })
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentLengthOffsetDisplay', 'value' : str(datetime.timedelta(seconds=currentOffset/1000)) })
-					if currentOffset == 0 or contentDuration == 0:
-						percentComplete = 0
+						clientStatesToUpdate = sessionStatesToUpdate + [{ 'key' : u'clientId', 'value' : playerMachineId }]
 					else:
-						percentComplete = int(((1.0 * currentOffset) / (1.0 * contentDuration)) * 100.0)
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentPercentComplete', 'value' : percentComplete, 'uiValue' : '{0:d}%'.format(percentComplete) })
+						clientStatesToUpdate = sessionStatesToUpdate
 					
-					# genre is a list, update the state as a comma-delimited string
-					clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGenre', 'value' : ",".join(session.genreList) })
-					if session.videoAttributes.get(u'type', u'unknown') == u'track' and session.videoAttributes.get(u'parentKey', u'') != '':
+					# genre information for music and shows is stored on the parent/grandparent
+					if mediaType == u'track' and parentKey != u'':
 						# this requires a separate call to load genre information from the parent
 						actionParams = indigo.Dict()
 						actionParams[u'deviceId'] = clientDevice.indigoDevice.id
-						actionParams[u'mediaKey'] = session.videoAttributes.get(u'parentKey', u'')
+						actionParams[u'mediaKey'] = parentKey
 						self.hostPlugin.executeAction(pluginAction=None, indigoActionId=u'getMediaMetadata', indigoDeviceId=int(self.indigoDevice.id), paramValues=actionParams)
-					elif session.videoAttributes.get(u'type', u'unknown') == u'episode' and session.videoAttributes.get(u'grandparentKey', u'') != '':
+					elif mediaType == u'episode' and grandparentKey != u'':
 						# this requires a separate call to load genre information from the grandparent
 						actionParams = indigo.Dict()
 						actionParams[u'deviceId'] = clientDevice.indigoDevice.id
-						actionParams[u'mediaKey'] = session.videoAttributes.get(u'grandparentKey', u'')
+						actionParams[u'mediaKey'] = grandparentKey
 						self.hostPlugin.executeAction(pluginAction=None, indigoActionId=u'getMediaMetadata', indigoDeviceId=int(self.indigoDevice.id), paramValues=actionParams)
 					
-					clientStatesToUpdate.append({ 'key' : u'playerDeviceTitle', 'value' : session.playerInfo.get(u'title', u'') })
-					
-					# update the states on the Indigo server
-					clientDevice.updateStatesForDevice(clientStatesToUpdate)
+					# queue the states to be sent to the Indigo server once all sessions are processed
+					self.queueChildDeviceStates(pendingClientStates, clientDevice, clientStatesToUpdate)
 				else:
-					self.hostPlugin.logger.debug(u'Found unknown client: ' + playerMachineId)
+					if debugLoggingEnabled:
+						self.hostPlugin.logger.debug(u'Found unknown client: ' + playerMachineId)
 				
 				# if the player is valid then add it to the currently-connected client list
 				if playerMachineId != u'':
 					newClientList.append((playerMachineId,playerName))
-					connectedClientHash[playerMachineId] = True
+					connectedClientIds.add(playerMachineId)
 
-			# we need to update the state of any clients NOT seen to "disconnected"
-			for childDeviceKey, childDevice in self.childDevices.iteritems():
-				if childDevice.indigoDevice.deviceTypeId == u'plexMediaClient':
-					if childDevice.indigoDevice.states.get(u'clientConnectionStatus', u'') != u'disconnected' and not (childDevice.indigoDevice.pluginProps.get(u'plexClientId', u'') in connectedClientHash):
-						# this device was not "seen" so we should mark it as being disconnected
-						clientStatesToUpdate = []
-						clientStatesToUpdate.append({ 'key' : u'clientConnectionStatus', 'value' : u'disconnected' })
-						clientStatesToUpdate.append({ 'key' : u'clientAddress', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'clientPort', 'value' : 0 })
-						clientStatesToUpdate.append({ 'key' : u'currentUser', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingKey', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingMediaType', 'value' : u'unknown' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingParentKey', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingTitle', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingSummary', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingArtUrl', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingThumbnailUrl', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingParentTitle', 'value' : u''})
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingParentThumbnailUrl', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGrandparentKey', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGrandparentTitle', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGrandparentArtUrl', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGrandparentThumbnailUrl', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlPlayingTitleYear', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingStarRating', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentRating', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentResolution', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentLengthMS', 'value' : 0 })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentLengthDisplay', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentLengthOffset', 'value' : 0 })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentLengthOffsetDisplay', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentPercentComplete', 'value' : 0 })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGenre', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'playerDeviceTitle', 'value' : u'' })
-						childDevice.updateStatesForDevice(clientStatesToUpdate)
-						
-				elif childDevice.indigoDevice.deviceTypeId == u'plexMediaClientSlot':
-					clientSlotNumStr = childDevice.indigoDevice.pluginProps.get('plexClientId', 'Slot 99')
-					if clientSlotNumStr == u'':
-						clientSlotNumStr = 'Slot 99'
-					clientSlotNumInt = int(clientSlotNumStr[5:])
-					
-					if clientSlotNumInt > slotNum:
-						clientStatesToUpdate = []
-						clientStatesToUpdate.append({ 'key' : u'clientConnectionStatus', 'value' : u'disconnected' })
-						clientStatesToUpdate.append({ 'key' : u'clientAddress', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'clientPort', 'value' : 0 })
-						clientStatesToUpdate.append({ 'key' : u'clientId', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentUser', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingKey', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingMediaType', 'value' : u'unknown' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingParentKey', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingTitle', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingSummary', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingArtUrl', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingThumbnailUrl', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingParentTitle', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingParentThumbnailUrl', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGrandparentKey', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGrandparentTitle', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGrandparentArtUrl', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGrandparentThumbnailUrl', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlPlayingTitleYear', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingStarRating', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentRating', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentResolution', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentLengthMS', 'value' : 0 })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentLengthDisplay', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentLengthOffset', 'value' : 0 })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentLengthOffsetDisplay', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingContentPercentComplete', 'value' : 0 })
-						clientStatesToUpdate.append({ 'key' : u'currentlyPlayingGenre', 'value' : u'' })
-						clientStatesToUpdate.append({ 'key' : u'playerDeviceTitle', 'value' : u'' })
-						childDevice.updateStatesForDevice(clientStatesToUpdate)
+			# we need to update the state of any clients NOT seen to "disconnected"; the child devices
+			# are keyed by their Plex client ID so the key may be checked directly
+			for childDeviceKey, childDevice in self.clientChildDevices.iteritems():
+				if not (childDeviceKey in connectedClientIds) and childDevice.indigoDevice.states.get(u'clientConnectionStatus', u'') != u'disconnected':
+					# this device was not "seen" so we should mark it as being disconnected
+					self.queueChildDeviceStates(pendingClientStates, childDevice, PLEX_CLIENT_DISCONNECTED_STATES)
+			
+			# any slots beyond the number of sessions are no longer in use (slots which were already
+			# marked as disconnected on a previous poll may be skipped)
+			for childDevice in self.slotChildDevices.itervalues():
+				if childDevice.clientSlotNumber > slotNum and childDevice.indigoDevice.states.get(u'clientConnectionStatus', u'') != u'disconnected':
+					self.queueChildDeviceStates(pendingClientStates, childDevice, PLEX_CLIENT_SLOT_DISCONNECTED_STATES)
+			
+			# send each device's states to the Indigo server in a single update (only those
+			# which have changed since the last poll will be sent)
+			for childDevice, childStatesToUpdate in pendingClientStates.itervalues():
+				childDevice.updateChangedStatesForDevice(childStatesToUpdate.values())
 			
-			# update our list of currently connected clients
-			self.hostPlugin.logger.debug(u'Updating current client list to: ' + RPFramework.RPFrameworkUtils.to_unicode(newClientList))
+			# update our list of currently connected clients along with the session/client counts
+			# of the server in a single update
+			if debugLoggingEnabled:
+				self.hostPlugin.logger.debug(u'Updating current client list to: ' + RPFramework.RPFrameworkUtils.to_unicode(newClientList))
 			self.currentClientList = newClientList
-			self.indigoDevice.updateStateOnServer(key=u'connectedClientCount', value=len(newClientList))
+			self.currentClientIdSet = connectedClientIds
+			serverStatesToUpdate = [
+				{'key' : u'activeSessionsCount', 'value' : int(plexContainer.containerAttributes["size"])},
+				{'key' : u'connectedClientCount', 'value' : len(newClientList)}
+			]
+			self.indigoDevice.updateStatesOnServer(serverStatesToUpdate)
 			
 	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
 	# This routine will be called in order to handle a valid return from the PMS which
@@ -326,9 +388,11 @@ class PlexMediaServer(RPFramework.RPFrameworkRESTfulDevice.RPFrameworkRESTfulDev
 	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
 	def handlePlexMediaMetadataResult(self, responseObj, rpCommand):
 		plexContainer = plexMediaContainer.PlexMediaContainer(responseObj, rpCommand.getPayloadAsList()[1])
-		self.hostPlugin.logger.debug(u'Metadata MediaContainer Information: ' + RPFramework.RPFrameworkUtils.to_unicode(plexContainer.containerAttributes))
-		self.hostPlugin.logger.debug(u'Metadata MediaContainer Media Count: ' + RPFramework.RPFrameworkUtils.to_unicode(len(plexContainer.videoSessions)))
-		self.hostPlugin.logger.debug(u'Metadata MediaContainer Directories Count: ' + RPFramework.RPFrameworkUtils.to_unicode(len(plexContainer.directories)))
+		debugLoggingEnabled = self.hostPlugin.logger.isEnabledFor(logging.DEBUG)
+		if debugLoggingEnabled:
+			self.hostPlugin.logger.debug(u'Metadata MediaContainer Information: ' + RPFramework.RPFrameworkUtils.to_unicode(plexContainer.containerAttributes))
+			self.hostPlugin.logger.debug(u'Metadata MediaContainer Media Count: ' + RPFramework.RPFrameworkUtils.to_unicode(len(plexContainer.videoSessions)))
+			self.hostPlugin.logger.debug(u'Metadata MediaContainer Directories Count: ' + RPFramework.RPFrameworkUtils.to_unicode(len(plexContainer.directories)))
 		
 		# loop through each directory... 
 		for mediaDir in plexContainer.directories:			
@@ -340,7 +404,7 @@ class PlexMediaServer(RPFramework.RPFrameworkRESTfulDevice.RPFrameworkRESTfulDev
 					(childDevice.indigoDevice.states.get(u'currentlyPlayingMediaType', u'unknown') == u'episode' and childDevice.indigoDevice.states.get(u'currentlyPlayingGrandparentKey', u'') == dirMediaKey):
 					 childStatesToUpdate = []
 					 childStatesToUpdate.append({ 'key' : u'currentlyPlayingGenre', 'value' : ",".join(mediaDir.genreList) })
-					 childDevice.updateStatesForDevice(childStatesToUpdate)
+					 childDevice.updateChangedStatesForDevice(childStatesToUpdate)
 				
 			
 	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
@@ -393,6 +457,31 @@ class PlexMediaServer(RPFramework.RPFrameworkRESTfulDevice.RPFrameworkRESTfulDev
 	#/////////////////////////////////////////////////////////////////////////////////////
 	# Utility Routines
 	#/////////////////////////////////////////////////////////////////////////////////////
+	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+	# This routine will split the child devices into the client and slot device indexes
+	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+	def rebuildChildDeviceIndexes(self):
+		clientChildDevices = dict()
+		slotChildDevices = dict()
+		for childDeviceKey, childDevice in self.childDevices.iteritems():
+			if childDevice.indigoDevice.deviceTypeId == u'plexMediaClient':
+				clientChildDevices[childDeviceKey] = childDevice
+			elif childDevice.indigoDevice.deviceTypeId == u'plexMediaClientSlot':
+				slotChildDevices[childDeviceKey] = childDevice
+		self.clientChildDevices = clientChildDevices
+		self.slotChildDevices = slotChildDevices
+		
+	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+	# This routine will add the states to the pending updates of the given child device;
+	# a state queued more than once for the device keeps only its latest value
+	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+	def queueChildDeviceStates(self, pendingStateUpdates, childDevice, statesToUpdate):
+		if not (childDevice.indigoDevice.id in pendingStateUpdates):
+			pendingStateUpdates[childDevice.indigoDevice.id] = (childDevice, collections.OrderedDict())
+		pendingDeviceStates = pendingStateUpdates[childDevice.indigoDevice.id][1]
+		for stateToUpdate in statesToUpdate:
+			pendingDeviceStates[stateToUpdate['key']] = stateToUpdate
+		
 	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
 	# This routine will gather a list of all of the clients connected to the media server
 	# for use in a menu / config dialog. It will ensure the passed-in value is always
@@ -400,17 +489,12 @@ class PlexMediaServer(RPFramework.RPFrameworkRESTfulDevice.RPFrameworkRESTfulDev
 	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
 	def retrieveCurrentClientMenu(self, selectedClient = u''):
 		# retrieve the last set of connected clients that were retrieved from the Plex server
-		currentClients = self.currentClientList
+		# (as a copy so that the selected client is not added to the stored list)
+		currentClients = list(self.currentClientList)
 		
 		# ensure that the selected client ID was found
-		if selectedClient != u'':
-			selectedClientFound = False
-			for client in currentClients:
-				if client[0] == selectedClient:
-					selectedClientFound = True
-							
-			if selectedClientFound == False:
-				currentClients.append((selectedClient, selectedClient))
+		if selectedClient != u'' and not (selectedClient in self.currentClientIdSet):
+			currentClients.append((selectedClient, selectedClient))
 		
 		return currentClients
 	
@@ -418,13 +502,8 @@ class PlexMediaServer(RPFramework.RPFrameworkRESTfulDevice.RPFrameworkRESTfulDev
 	# This routine will gather generate a menu of slots available for "generic" clients
 	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
 	def retrieveCurrentClientSlotMenu(self):
-		currentClients = []
-	
-		# append the "generic slots" to the list
-		for slotNum in range(1,11):
-			currentClients.append(("Slot " + RPFramework.RPFrameworkUtils.to_unicode(slotNum), "Slot " + RPFramework.RPFrameworkUtils.to_unicode(slotNum)))
-		
-		return currentClients
+		# the slots never change; return a copy so that callers are free to modify the list
+		return list(PLEX_CLIENT_SLOT_MENU)
 		
 	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
 	# This routine will attempt to obtain the Plex security token from the Plex service
@@ -433,21 +512,23 @@ class PlexMediaServer(RPFramework.RPFrameworkRESTfulDevice.RPFrameworkRESTfulDev
 		# we need to obtain a security token from the plex website in order to_unicode
 		# access the plex server; if we already have a security token this may be skipped
 		if self.plexSecurityToken == u'':
-			plexHeaders = {u'X-Plex-Platform':u'Indigo', u'X-Plex-Platform-Version':indigo.server.apiVersion, u'X-Plex-Provides':u'controller', u'X-Plex-Client-Identifier':indigo.server.getDbName(), u'X-Plex-Product':u'Plex Media Server Manager', u'X-Plex-Version':self.hostPlugin.pluginVersion, u'X-Plex-Device':u'Indigo HA Server', u'X-Plex-Device-Name':u'Indigo Plugin'}
-			
-			responseObj = requests.post(u'https://plex.tv/users/sign_in.xml', headers=plexHeaders, auth=(self.indigoDevice.pluginProps.get(u'plexUsername', u''), self.indigoDevice.pluginProps.get(u'plexPassword', u'')))
-			self.hostPlugin.logger.threaddebug(u'Plex.tv Sign-In Response: [' + RPFramework.RPFrameworkUtils.to_unicode(responseObj.status_code) + u'] ' + RPFramework.RPFrameworkUtils.to_unicode(responseObj.text))
-			self.hostPlugin.logger.threaddebug(u'Plex.tv Sign-In Response Headers: ' + RPFramework.RPFrameworkUtils.to_unicode(responseObj.headers))
+			responseObj = self.httpSession.post(u'https://plex.tv/users/sign_in.xml', auth=(self.indigoDevice.pluginProps.get(u'plexUsername', u''), self.indigoDevice.pluginProps.get(u'plexPassword', u'')))
+			if self.hostPlugin.logger.isEnabledFor(THREADDEBUG_LOGGING_LEVEL):
+				self.hostPlugin.logger.threaddebug(u'Plex.tv Sign-In Response: [' + RPFramework.RPFrameworkUtils.to_unicode(responseObj.status_code) + u'] ' + RPFramework.RPFrameworkUtils.to_unicode(responseObj.text))
+				self.hostPlugin.logger.threaddebug(u'Plex.tv Sign-In Response Headers: ' + RPFramework.RPFrameworkUtils.to_unicode(responseObj.headers))
 			
 			# if successful, this should be a 201 response (Created)
 			if responseObj.status_code == 201:
-				# the response will be an XML return...
-				authenticationXml = xml.etree.ElementTree.fromstring(RPFramework.RPFrameworkUtils.to_str(responseObj.text))
-				authTokenNode = authenticationXml.find(u'authentication-token')
-				self.plexSecurityToken = authTokenNode.text
+				# the response will be an XML return of the user's account; only the token is needed
+				# so stream the raw bytes through the parser and stop as soon as it has been read
+				for parseEvent, xmlNode in ElementTree.iterparse(io.BytesIO(responseObj.content)):
+					if xmlNode.tag == u'authentication-token':
+						self.plexSecurityToken = xmlNode.text or u''
+						break
+				
+			if self.plexSecurityToken != u'':
 				self.hostPlugin.logger.debug(u'Successfully obtained plex.tv authentication token')
 			else:
-				self.plexSecurityToken = u''
 				self.hostPlugin.logger.error(u'Failed to obtain authentication token from plex.tv site.')
 			
 			
@@ -473,6 +554,15 @@ class PlexMediaClient(RPFramework.RPFrameworkNonCommChildDevice.RPFrameworkNonCo
 		
 		self.clientCommandID = 0
 		
+		# the slot number of a generic slot device is fixed for the lifetime of the device, so
+		# parse it once here rather than upon each poll of the server
+		self.clientSlotNumber = None
+		if device.deviceTypeId == u'plexMediaClientSlot':
+			clientSlotNumStr = device.pluginProps.get('plexClientId', 'Slot 99')
+			if clientSlotNumStr == u'':
+				clientSlotNumStr = 'Slot 99'
+			self.clientSlotNumber = int(clientSlotNumStr[5:])
+		
 		self.upgradedDeviceStates.append(u'currentlyPlayingParentThumbnailUrl')
 		self.upgradedDeviceStates.append(u'currentlyPlayingGrandparentArtUrl')
 		self.upgradedDeviceStates.append(u'currentlyPlayingSummary')
@@ -497,4 +587,26 @@ class PlexMediaClient(RPFramework.RPFrameworkNonCommChildDevice.RPFrameworkNonCo
 	def getClientCommandID(self):
 		self.clientCommandID += 1
 		return self.clientCommandID
-		
\ No newline at end of file
+		
+	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+	# Updates the given states on the Indigo server, skipping any state whose value already
+	# matches the current value of the device; nothing is sent if no values have changed
+	#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+	def updateChangedStatesForDevice(self, statesToUpdate):
+		currentStates = self.indigoDevice.states
+		changedStates = [stateToUpdate for stateToUpdate in statesToUpdate if currentStates.get(stateToUpdate['key'], None) != stateToUpdate['value']]
+		if len(changedStates) > 0:
+			self.updateStatesForDevice(changedStates)
+			
+			
+#/////////////////////////////////////////////////////////////////////////////////////////
+#/////////////////////////////////////////////////////////////////////////////////////////
+# Static Utility Routines
+#/////////////////////////////////////////////////////////////////////////////////////////
+#/////////////////////////////////////////////////////////////////////////////////////////
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+# Formats a length of time given in milliseconds as H:MM:SS for display in the states
+#-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-=-
+def formatMillisecondsForDisplay(milliseconds):
+	totalSeconds = milliseconds // 1000
+	return u'%d:%02d:%02d' % (totalSeconds // 3600, (totalSeconds // 60) % 60, totalSeconds % 60)
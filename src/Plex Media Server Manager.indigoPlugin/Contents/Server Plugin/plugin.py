@@ -237,7 +237,8 @@ class Plugin(RPFramework.RPFrameworkPlugin.RPFrameworkPlugin):
 		# execute the request to the client...
 		targetUrl = u'http://' + clientAddress + u':' + str(clientPort) + u'/player/' + paramValues.get(u'commandToSend').replace(u'-', u'/') + u'?commandID=' + str(plexClientDevice.getClientCommandID()) + mediaTypeParam
 		plexHeaders = {u'X-Plex-Platform':u'Indigo', u'X-Plex-Platform-Version':indigo.server.apiVersion, u'X-Plex-Provides':u'controller', u'X-Plex-Client-Identifier':indigo.server.getDbName(), u'X-Plex-Product':u'PlexAPI', u'X-Plex-Version':self.pluginVersion, u'X-Plex-Device':u'Indigo HA Server', u'X-Plex-Device-Name':u'Indigo Plugin', u'X-Plex-Token':plexServerDevice.plexSecurityToken, u'X-Plex-Target-Client-Identifier':plexClientMachineId}
-		self.logger.threaddebug(u'Sending client playback command: ' + targetUrl + ' with headers: ' + RPFramework.RPFrameworkUtils.to_unicode(plexHeaders))
+		if self.logger.isEnabledFor(plexMediaServerDevices.THREADDEBUG_LOGGING_LEVEL):
+			self.logger.threaddebug(u'Sending client playback command: ' + targetUrl + ' with headers: ' + RPFramework.RPFrameworkUtils.to_unicode(plexHeaders))
 		responseObj = requests.get(targetUrl, headers=plexHeaders)
 		
 		self.logger.debug(u'Client Command Response: [' + unicode(responseObj.status_code) + u'] ' + responseObj.text)